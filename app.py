@@ -12,24 +12,27 @@ High-level responsibilities:
 """
 
 from __future__ import annotations
+import html
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 import streamlit as st
-from openai import OpenAI
-from museum_api import fx_search, fx_search_result, CMA_LABEL, MET_LABEL
-from chat import get_system_prompt
+from museum_api import fx_search, fx_search_results, CMA_LABEL, MET_LABEL
+from chat import get_system_prompt, stream_messages
 
-# Best practice: Wrap the app in a main() to avoid global state issues.
 
+@st.cache_resource(show_spinner=False)
+def _load_dotenv() -> None:
+    """Load the .env file (for local development) once per process."""
+    env_path = Path(".env")
+    if env_path.exists():
+        load_dotenv(dotenv_path=env_path)
 
-def main() -> None:
 
+def _load_api_key() -> str | None:
     # Set OpenAI API key from Streamlit secrets, .env, or environment var.
     # 1. Load .env file (for local development)
-    env_path = Path(".env")
-    if env_path.exists():
-        load_dotenv(dotenv_path=env_path)
+    _load_dotenv()
 
     # 2. Check Streamlit secrets (preferred for production).
     # Set secrets locally in .streamlit/secrets.toml or in Streamlit Cloud UI.
@@ -45,6 +48,125 @@ def main() -> None:
     openai_api_key = secret_key or env_key
     if openai_api_key:
         os.environ.setdefault("OPENAI_API_KEY", openai_api_key)
+    return openai_api_key
+
+
+def _store_results(museum: str, q: str, highlight: bool, results: list) -> None:
+    """Save search results, their display dicts, and the query that made them."""
+    st.session_state["last_query"] = (museum, q, highlight)
+    st.session_state["results"] = results
+    st.session_state["results_display"] = fx_search_results(museum, results)
+
+
+def _maybe_search(museum: str, q: str, highlight: bool = False) -> list:
+    """Run a search unless it repeats the one whose results are showing."""
+    if st.session_state.get("last_query") == (museum, q, highlight):
+        return st.session_state["results"]
+    results = fx_search(museum, q, highlight=highlight)
+    _store_results(museum, q, highlight, results)
+    return results
+
+
+def _lazy_image(url: str, style: str) -> None:
+    """Render an image the browser fetches, caches and lazy-loads itself.
+
+    Unlike `st.image`, nothing is downloaded or re-encoded on the server.
+    """
+    st.markdown(
+        f'<img src="{html.escape(url)}" loading="lazy" style="{style}">',
+        unsafe_allow_html=True
+    )
+
+
+@st.fragment
+def _render_results(museum: str, results: list, results_display: list) -> None:
+    """Render the search results grid.
+
+    As a fragment, the grid is left untouched by reruns of other fragments
+    such as the chat panel.
+    """
+    if not results:
+        st.info("No results yet. Try a search.")
+    else:
+        result_cols = st.columns(3)
+        for i, (art, display) in enumerate(zip(results, results_display)):
+            with result_cols[i % 3]:
+                if display["img_url"]:
+                    _lazy_image(display["img_url"], "width:100%")
+                st.markdown(f"**{display['title']}**")
+                st.caption(
+                    f"{display['artist']} — {display['creation_date']}")
+                if st.button("View", key=f"view_{i}"):
+                    st.session_state["selected"] = (museum, art, display)
+                    st.rerun()
+
+
+@st.fragment
+def _render_chat(selected: tuple | None, openai_api_key: str | None) -> None:
+    """Render the chat panel.
+
+    Sending a message only reruns this fragment, not the results grid.
+    """
+    st.subheader("ArtRogue Chat")
+
+    if "messages" not in st.session_state:
+        st.session_state["messages"] = [
+            {"role": "assistant", "content": "How can I help you?"}]
+
+    # Create a container for the chat messages
+    chat_container = st.container(height=600)
+
+    # Create a container for the chat input at the bottom
+    input_container = st.container()
+
+    # Summarize a newly selected artwork once, rather than on every rerun.
+    # It only counts as done once the reply has fully streamed, so a summary
+    # interrupted by another interaction is retried on the next run.
+    # if st.button("Summarize artwork in Januszczak style"):
+    summarize = bool(selected) and st.session_state.get(
+        "summarized") != selected
+    if summarize:
+        _, art, _ = selected
+        sys_msg = {"role": "system",
+                   "content": get_system_prompt()}
+        user_msg = {
+            "role": "user",
+            "content": "I am looking at an image of a work of art. What should I understand about it? No need to see the image. Here is the metadata: " + str(art)
+        }
+        st.session_state.messages = [sys_msg, user_msg]
+
+    # Chat input
+    with input_container:
+        prompt = st.chat_input()
+    if prompt:
+        st.session_state.messages.append(
+            {"role": "user", "content": prompt})
+
+    # Display chat messages in the container above the input, then
+    # stream the assistant reply into a placeholder as chunks arrive.
+    with chat_container:
+        for msg in st.session_state.messages:
+            # The system prompt is sent to the model, not shown to the user.
+            if msg["role"] != "system":
+                st.chat_message(msg["role"]).write(msg["content"])
+        if summarize or prompt:
+            placeholder = st.chat_message("assistant").empty()
+            reply = ""
+            for chunk in stream_messages(st.session_state.messages, openai_api_key):
+                reply += chunk
+                placeholder.markdown(reply)
+            st.session_state.messages.append(
+                {"role": "assistant", "content": reply})
+            if summarize:
+                st.session_state["summarized"] = selected
+
+
+# Best practice: Wrap the app in a main() to avoid global state issues.
+
+
+def main() -> None:
+
+    openai_api_key = _load_api_key()
 
     # Configure Streamlit page
     st.set_page_config(
@@ -69,16 +191,15 @@ def main() -> None:
         st.markdown("---")
         q = st.text_input("Search", value="van gogh")
         if st.button("Search"):
-            results = fx_search(museum, q)
-            st.session_state["results"] = results
+            _maybe_search(museum, q)
         st.markdown("---")
         c1, c2 = st.columns([1, 1])
+        # These two always draw a fresh sample, so they skip the guard.
         if c1.button("Surprise Me"):
-            results = fx_search(museum, "*")
-            st.session_state["results"] = results
+            _store_results(museum, "*", False, fx_search(museum, "*"))
         if c2.button("What's New?"):
-            results = fx_search(museum, "*", highlight=True)
-            st.session_state["results"] = results
+            _store_results(museum, "*", True,
+                           fx_search(museum, "*", highlight=True))
 
     # Main content area with two columns. Left col for search results,
     # right for chat interface.
@@ -92,6 +213,8 @@ def main() -> None:
 
         # `results` is set when user clicks button to generate search results.
         results = st.session_state.get("results", [])
+        # Normalized once per search so reruns don't redo the mapping.
+        results_display = st.session_state.get("results_display", [])
 
         # Add a "Back to Results" button when a painting is selected.
         # Clicking the button sets `selected` back to none so the displayed
@@ -102,82 +225,19 @@ def main() -> None:
 
         # Show either the selected painting or the search results
         if selected:
-            # Display selected artwork
-            museum_label, art = selected
-            display = fx_search_result(museum_label, art)
+            # Display selected artwork, normalized when its card was clicked
+            _, art, display = selected
             st.header(display["title"])
-            st.image(display["img_url"], width=800)
+            _lazy_image(display["img_url"], "width:800px;max-width:100%")
             st.write(f"**Artist:** {display['artist']}")
             st.write(f"**Date:** {display['creation_date']}")
         else:
             # Display search results
-            if not results:
-                st.info("No results yet. Try a search.")
-            else:
-                result_cols = st.columns(3)
-                for i, art in enumerate(results):
-                    display = fx_search_result(museum, art)
-                    with result_cols[i % 3]:
-                        if display["img_url"]:
-                            st.image(display["img_url"],
-                                     use_container_width=True)
-                        st.markdown(f"**{display['title']}**")
-                        st.caption(
-                            f"{display['artist']} — {display['creation_date']}")
-                        if st.button("View", key=f"view_{i}"):
-                            st.session_state["selected"] = (museum, art)
-                            st.rerun()
+            _render_results(museum, results, results_display)
 
     # Right column for chat interface
     with col2:
-        st.subheader("ArtRogue Chat")
-
-        if "messages" not in st.session_state:
-            st.session_state["messages"] = [
-                {"role": "assistant", "content": "How can I help you?"}]
-
-        # Create a container for the chat messages
-        chat_container = st.container(height=600)
-
-        # Create a container for the chat input at the bottom
-        input_container = st.container()
-
-        # Handle chat input first (at the bottom)
-        with input_container:
-            if selected:
-                # if st.button("Summarize artwork in Januszczak style"):
-                sys_msg = {"role": "system",
-                           "content": get_system_prompt()}
-                user_msg = {
-                    "role": "user",
-                    "content": "I am looking at an image of a work of art. What should I understand about it? No need to see the image. Here is the metadata: " + str(art)
-                }
-                st.session_state.messages = [sys_msg, user_msg]
-                client = OpenAI(api_key=openai_api_key)
-                response = client.chat.completions.create(
-                    model="gpt-4.1-mini",
-                    messages=st.session_state.messages
-                )
-                msg = response.choices[0].message.content
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": msg})
-            # Chat input
-            if prompt := st.chat_input():
-                client = OpenAI(api_key=openai_api_key)
-                st.session_state.messages.append(
-                    {"role": "user", "content": prompt})
-                response = client.chat.completions.create(
-                    model="gpt-4.1-mini",
-                    messages=st.session_state.messages
-                )
-                msg = response.choices[0].message.content
-                st.session_state.messages.append(
-                    {"role": "assistant", "content": msg})
-
-        # Display chat messages in the container above the input
-        with chat_container:
-            for msg in st.session_state.messages:
-                st.chat_message(msg["role"]).write(msg["content"])
+        _render_chat(selected, openai_api_key)
 
 
 if __name__ == "__main__":
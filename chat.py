@@ -1,3 +1,16 @@
+import asyncio
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import streamlit as st
+from openai import AsyncOpenAI
+
+MODEL = "gpt-4.1-mini"
+
+# Marks the end of a streamed reply on the chunk queue.
+_DONE = object()
+
 
 def get_system_prompt() -> str:
     return (
@@ -5,3 +18,69 @@ def get_system_prompt() -> str:
         "You respond to questions about artworks, artists, and museum collections with historical insight and cultural comparisons. "
         "Avoid a dry academic tone - be bold and conversational. If possible, include an unexpected detail or interpretation."
     )
+
+
+@st.cache_resource(show_spinner=False)
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Run one event loop in a daemon thread for all OpenAI streaming calls."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+
+@st.cache_resource(show_spinner=False)
+def _get_openai(api_key: Optional[str]) -> AsyncOpenAI:
+    """Build one OpenAI client per key so its connection pool is reused across reruns."""
+    # Only ever used on the `_get_loop()` loop, so its pool never crosses loops.
+    return AsyncOpenAI(api_key=api_key)
+
+
+def _extract_delta(event) -> str:
+    """Return the text delta of a streamed chunk, or "" if it carries none."""
+    # Some chunks (e.g. usage or content-filter events) arrive with no choices.
+    try:
+        return event.choices[0].delta.content or ""
+    except (AttributeError, IndexError):
+        return ""
+
+
+async def _astream_messages(client: AsyncOpenAI, messages: List[Dict[str, str]], out: queue.Queue) -> None:
+    try:
+        stream = await client.chat.completions.create(
+            model=MODEL,
+            messages=messages,
+            stream=True
+        )
+        try:
+            async for event in stream:
+                delta = _extract_delta(event)
+                if delta:
+                    out.put(delta)
+        finally:
+            # Release the HTTP stream even when the task is cancelled.
+            await stream.close()
+    except Exception as exc:
+        out.put(exc)
+    finally:
+        out.put(_DONE)
+
+
+def stream_messages(messages: List[Dict[str, str]], api_key: Optional[str] = None) -> Iterator[str]:
+    """Stream the assistant reply for `messages`, yielding text chunks as they arrive.
+
+    The request runs on a background event loop; this generator hands the
+    chunks back to the (synchronous) Streamlit script thread. Closing the
+    generator early cancels the request.
+    """
+    out: queue.Queue = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(
+        _astream_messages(_get_openai(api_key), messages, out), _get_loop())
+    try:
+        while (item := out.get()) is not _DONE:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # If the caller stops early (e.g. Streamlit interrupts the script),
+        # stop the completion too rather than streaming into an unread queue.
+        future.cancel()
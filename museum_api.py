@@ -7,24 +7,122 @@ provides two search entry points (`fx_search`) and normalization helper
 Key functions:
 - fx_search(api_label, q, highlight=False) -> list[artwork dicts]
 - fx_search_result(api_label, artwork) -> dict with img_url, title, artist, creation_date
+- fx_search_results(api_label, artworks) -> list of the above, for a whole result set
 
 Notes:
 - This code is intentionally small and defensive. Museum APIs return slightly
-    different shapes, so `fx_search_result` normalizes them for the UI.
+    different shapes, so `fx_search_results` normalizes them for the UI.
 """
 from __future__ import annotations
 
+import json
 import random
-from typing import Any, Dict, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 import requests
-from urllib.parse import quote_plus
+from requests.adapters import HTTPAdapter
+from requests_cache import CachedSession
+from urllib3.util import Retry
+import streamlit as st
+from urllib.parse import urlencode
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib parser is just slower
+    _loads = json.loads
 
 CMA_API = "https://openaccess-api.clevelandart.org/api/artworks/"
 MET_API = "https://collectionapi.metmuseum.org/public/collection/v1/"
 
+# Query parameters that never change between searches. CMA asks only for
+# the display fields plus some context for chat, and 25 records is enough
+# variety for 5-card samples without over-fetching.
+_CMA_PARAMS = {
+    "has_image": 1,
+    "limit": 25,
+    "fields": "id,title,creation_date,creators,images,culture,technique,type,description",
+}
+_MET_PARAMS = {"hasImages": "true"}
+
+# Shared stand-ins for missing nested dicts and empty results. Callers only
+# read from these, so they are returned as-is; never mutate them.
+_EMPTY: Dict[str, Any] = {}
+_EMPTY_RESULT: Dict[str, str] = {
+    "img_url": "", "title": "", "artist": "", "creation_date": ""}
+
 CMA_LABEL = "Cleveland (CMA)"
 MET_LABEL = "Metropolitan (MMA)"
 
+# Shared session so repeated calls reuse pooled keep-alive connections instead
+# of paying a fresh TCP + TLS handshake per request. API responses are also
+# cached on disk next to this module for a day so they survive app restarts;
+# if an API is down, a stale copy is served instead of an error. Images are
+# loaded by the browser, so only the museum APIs ever go through here.
+_SESSION = CachedSession(
+    str(Path(__file__).parent / "museum_cache"),
+    backend="sqlite",
+    expire_after=86400,
+    allowable_methods=("GET",),
+    stale_if_error=True,
+)
+# Keep the file bounded: on startup, drop responses more than a week old.
+# Newer expired ones stay as stale fallbacks for outages.
+_SESSION.cache.delete(older_than=timedelta(days=7), invalid=True)
+# Transient 429/5xx responses are retried with backoff before we give up.
+# pool_maxsize covers the MET fan-out plus the background prefetch at once.
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.1,
+                      status_forcelist=(429, 502, 503, 504),
+                      allowed_methods=frozenset(["GET"])),
+))
+# Accept-Encoding is left to requests: it advertises `br` whenever the
+# brotli package is installed, and only then can the body be decoded.
+_SESSION.headers["User-Agent"] = (
+    "ArtRogue (+https://github.com/mpfoley73/art-rogue-streamlit)")
+# (connect, read): fail fast on unreachable hosts, allow slow responses.
+_TIMEOUT = (3.05, 10)
+
+# Long-lived worker threads for the per-search MET object fan-out, so a
+# search doesn't pay for spinning up a new pool each time.
+_POOL = ThreadPoolExecutor(max_workers=8)
+# Small separate pool for background warm-ups: bounded, and never queued
+# ahead of the fetches a user is waiting on.
+_PREFETCH_POOL = ThreadPoolExecutor(max_workers=2)
+
+# Next MET sample per (q, highlight), drawn and warmed one search ahead.
+_MET_NEXT: Dict[Tuple[str, bool], List[int]] = {}
+_MET_NEXT_LOCK = threading.Lock()
+_MET_NEXT_MAX = 256
+
+
+@st.cache_data(ttl=86400, max_entries=128, show_spinner=False)
+def _fetch_cma(q: str, highlight: bool) -> List[Dict[str, Any]]:
+    """Fetch the full CMA result set for a query.
+
+    Cached on `(q, highlight)` so Streamlit reruns don't re-hit the API. The
+    caller samples from the cached list so each search still looks fresh.
+    The TTL matches the session's one-day disk cache, which already decides
+    how fresh the response is.
+    """
+    params = dict(_CMA_PARAMS)
+    # An empty query means "any", which CMA also gets by omitting `q`.
+    if q:
+        params["q"] = q
+    if highlight:
+        params["highlight"] = 1
+    url = CMA_API + "?" + urlencode(params)
+    resp = _SESSION.get(url, timeout=_TIMEOUT)
+    resp.raise_for_status()
+    payload = _loads(resp.content)
+    # API response stores records under `data`.
+    return payload.get("data", []) or []
+
 
 def fx_search_cma(q: str = "", highlight: bool = False) -> List[Dict[str, Any]]:
     """Search the Cleveland Museum of Art (CMA) Open Access API.
@@ -38,54 +136,93 @@ def fx_search_cma(q: str = "", highlight: bool = False) -> List[Dict[str, Any]]:
     """
     if q == "*":
         q = ""
-    highlight_q = "&highlight=1" if highlight else ""
-    url = f"{CMA_API}?q={quote_plus(q)}&has_image=1&limit=100{highlight_q}"
-    resp = requests.get(url, timeout=10)
-    resp.raise_for_status()
-    payload = resp.json()
-    # API response stores records under `data`.
-    data = payload.get("data", []) or []
+    data = _fetch_cma(q, highlight)
     if not data:
         return []
-    # Sample a small subset for the demo UI. Use try/except to guard small lists.
+    # Sample a small subset for the demo UI. Picking indices avoids copying
+    # every record reference; `k` never exceeds the list length.
     k = min(5, len(data))
-    try:
-        sampled = random.sample(data, k=k)
-    except ValueError:
-        sampled = data[:k]
-    return sampled
+    return [data[i] for i in random.sample(range(len(data)), k)]
+
+
+@st.cache_data(ttl=86400, max_entries=256, show_spinner=False)
+def _fetch_met_ids(q: str, highlight: bool) -> List[int]:
+    """Fetch the objectIDs matching a MET search, cached on `(q, highlight)`.
+
+    The ID list for a query changes rarely, so it is kept for a day; repeat
+    searches then only pay for the sampled object fetches.
+    """
+    params = {**_MET_PARAMS, "q": q}
+    if highlight:
+        params["isHighlight"] = "true"
+    # Keep `*` literal so MET treats it as a wildcard rather than `%2A`.
+    url = MET_API + "search?" + urlencode(params, safe="*")
+    resp = _SESSION.get(url, timeout=_TIMEOUT)
+    resp.raise_for_status()
+    result_set = _loads(resp.content)
+    return result_set.get("objectIDs") or []
 
 
 def fx_search_met(q: str = "*", highlight: bool = False) -> List[Dict[str, Any]]:
     # The MET API returns objectIDs for a search; we then fetch object metadata
     # for a small sample of those IDs.
-    highlight_q = "&isHighlight=true" if highlight else ""
-    url = (
-        f"{MET_API}search?isHighlight=true&isOnView=true&hasImages=true&q={quote_plus(q)}{highlight_q}"
-    )
-    resp = requests.get(url, timeout=10)
-    resp.raise_for_status()
-    result_set = resp.json()
-    object_ids = result_set.get("objectIDs") or []
+    object_ids = _fetch_met_ids(q, highlight)
     if not object_ids:
         return []
-    # Sample a few IDs to limit API calls
-    k = min(5, len(object_ids))
-    sampled_ids = random.sample(object_ids, k=k)
-    artworks = []
-    for obj_id in sampled_ids:
-        try:
-            obj_url = f"{MET_API}objects/{obj_id}"
-            r = requests.get(obj_url, timeout=10)
-            r.raise_for_status()
-            art = r.json()
-            artworks.append(art)
-        except Exception:
-            # Skip problematic IDs (network errors or missing records)
-            continue
+    # Use the sample pre-drawn (and warmed) by the previous search for this
+    # query, or draw one now if there is none.
+    key = (q, highlight)
+    with _MET_NEXT_LOCK:
+        sampled_ids = _MET_NEXT.pop(key, None)
+    if sampled_ids is None:
+        sampled_ids = _sample_met_ids(object_ids)
+    # Fetch the object records in parallel so the wall time is roughly one
+    # round-trip rather than one per ID.
+    fetched = _POOL.map(_fetch_met_object, sampled_ids)
+    artworks = [art for art in fetched if art is not None][:5]
+
+    # Pre-draw the next sample for this query and warm its records in the
+    # background, so the next Surprise Me / search click reads from memory.
+    next_ids = _sample_met_ids(object_ids)
+    with _MET_NEXT_LOCK:
+        _MET_NEXT[key] = next_ids
+        while len(_MET_NEXT) > _MET_NEXT_MAX:
+            del _MET_NEXT[next(iter(_MET_NEXT))]
+    _prefetch_ids(next_ids)
     return artworks
 
 
+def _sample_met_ids(object_ids: List[int]) -> List[int]:
+    # Take a few spares so that records which still fail after retries don't
+    # leave the grid short of 5.
+    k = min(8, len(object_ids))
+    return [object_ids[i] for i in random.sample(range(len(object_ids)), k)]
+
+
+@st.cache_data(ttl=7 * 86400, max_entries=4096, show_spinner=False)
+def _fetch_met_object_cached(obj_id: int) -> Dict[str, Any]:
+    # Object records are effectively immutable, so keep them for a week.
+    # Raises on failure so that errors are never cached.
+    r = _SESSION.get(f"{MET_API}objects/{obj_id}", timeout=_TIMEOUT)
+    r.raise_for_status()
+    return _loads(r.content)
+
+
+def _fetch_met_object(obj_id: int) -> Optional[Dict[str, Any]]:
+    """Fetch a single MET object record, or None if it can't be retrieved."""
+    try:
+        return _fetch_met_object_cached(obj_id)
+    except (requests.RequestException, ValueError):
+        # Skip problematic IDs (network errors or missing records)
+        return None
+
+
+def _prefetch_ids(ids: List[int]) -> None:
+    """Queue background fetches of MET object records into the object cache."""
+    for obj_id in ids:
+        _PREFETCH_POOL.submit(_fetch_met_object, obj_id)
+
+
 def fx_search(api_label: str, q: str, highlight: bool = False) -> List[Dict[str, Any]]:
     """Dispatch search to the requested API label."""
     if api_label == CMA_LABEL:
@@ -101,34 +238,48 @@ def fx_search_result(api_label: str, artwork: Dict[str, Any]) -> Dict[str, str]:
     The UI expects these keys: `img_url`, `title`, `artist`, `creation_date`.
     This function extracts the most common fields used by the CMA and MET APIs.
     """
-    if not artwork:
-        return {"img_url": "", "title": "", "artist": "", "creation_date": ""}
+    return fx_search_results(api_label, [artwork])[0]
 
-    if api_label == CMA_LABEL:
-        # CMA nests image under images.web.url, and stores creators as a list
-        img_url = artwork.get("images", {}).get("web", {}).get("url", "")
-        title = artwork.get("title", "")
-        creators = artwork.get("creators") or []
-        artist = ""
-        if creators and isinstance(creators, list) and len(creators) > 0:
-            first = creators[0]
-            artist = first.get("description") or first.get("display") or ""
-        creation_date = artwork.get("creation_date", "")
-    elif api_label == MET_LABEL:
-        # MET uses different key names
-        img_url = artwork.get("primaryImageSmall", "")
-        title = artwork.get("title", "")
-        artist = artwork.get("artist", "")
-        creation_date = artwork.get("objectDate", "")
-    else:
-        img_url = ""
-        title = ""
-        artist = ""
-        creation_date = ""
 
+def fx_search_results(api_label: str, artworks: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Normalize a whole result list at once; the app's normalization path.
+
+    The API label is resolved once for the batch instead of once per item.
+    """
+    norm = _NORMALIZERS.get(api_label, _norm_none)
+    return [norm(a) if a else _EMPTY_RESULT for a in artworks]
+
+
+def _norm_cma(artwork: Dict[str, Any]) -> Dict[str, str]:
+    # CMA nests image under images.web.url, and stores creators as a list
+    images = artwork.get("images") or _EMPTY
+    web = images.get("web") or _EMPTY
+    creators = artwork.get("creators")
+    artist = ""
+    if isinstance(creators, list) and creators:
+        first = creators[0]
+        artist = first.get("description") or first.get("display") or ""
     return {
-        "img_url": img_url or "",
-        "title": title or "",
-        "artist": artist or "",
-        "creation_date": creation_date or "",
+        "img_url": web.get("url") or "",
+        "title": artwork.get("title") or "",
+        "artist": artist,
+        "creation_date": artwork.get("creation_date") or "",
     }
+
+
+def _norm_met(artwork: Dict[str, Any]) -> Dict[str, str]:
+    # MET uses different key names
+    return {
+        "img_url": artwork.get("primaryImageSmall") or "",
+        "title": artwork.get("title") or "",
+        "artist": artwork.get("artist") or "",
+        "creation_date": artwork.get("objectDate") or "",
+    }
+
+
+def _norm_none(artwork: Dict[str, Any]) -> Dict[str, str]:
+    return _EMPTY_RESULT
+
+
+# Per-API normalizers, keyed by museum label.
+_NORMALIZERS = {CMA_LABEL: _norm_cma, MET_LABEL: _norm_met}
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import chat
+
+
+def _event(content):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class _FakeStream:
+    def __init__(self, chunks, forever=False):
+        self._chunks = list(chunks)
+        self._forever = forever
+        self.closed = threading.Event()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(0.01)
+        if self._chunks:
+            return _event(self._chunks.pop(0))
+        if self._forever:
+            return _event("more")
+        raise StopAsyncIteration
+
+    async def close(self):
+        self.closed.set()
+
+
+class _FakeAsyncOpenAI:
+    def __init__(self, stream=None, error=None):
+        self._stream = stream
+        self._error = error
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        if self._error:
+            raise self._error
+        return self._stream
+
+
+def test_stream_messages_yields_chunks_in_order(monkeypatch):
+    stream = _FakeStream(["Hel", None, "lo", "!"])
+    monkeypatch.setattr(chat, "_get_openai", lambda key: _FakeAsyncOpenAI(stream))
+    assert list(chat.stream_messages([])) == ["Hel", "lo", "!"]
+    assert stream.closed.wait(1)
+
+
+def test_stream_messages_reraises_in_caller(monkeypatch):
+    client = _FakeAsyncOpenAI(error=RuntimeError("boom"))
+    monkeypatch.setattr(chat, "_get_openai", lambda key: client)
+    with pytest.raises(RuntimeError, match="boom"):
+        list(chat.stream_messages([]))
+
+
+def test_abandoned_stream_is_cancelled(monkeypatch):
+    stream = _FakeStream(["first"], forever=True)
+    monkeypatch.setattr(chat, "_get_openai", lambda key: _FakeAsyncOpenAI(stream))
+    gen = chat.stream_messages([])
+    assert next(gen) == "first"
+    gen.close()
+    # Cancelling the task closes the HTTP stream instead of reading on forever.
+    assert stream.closed.wait(1)
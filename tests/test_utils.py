@@ -1,4 +1,6 @@
+import json
 import museum_api
+import pytest
 import sys
 from pathlib import Path
 
@@ -11,3 +13,92 @@ def test_fx_search_result_empty():
     out = museum_api.fx_search_result("unknown", {})
     assert out["img_url"] == ""
     assert out["title"] == ""
+
+
+def test_fx_search_result_cma():
+    art = {
+        "id": 1,
+        "title": "The Large Plane Trees",
+        "creation_date": "1889",
+        "images": {"web": {"url": "https://example.org/a.jpg"}},
+        "creators": [{"description": "Vincent van Gogh"}],
+    }
+    out = museum_api.fx_search_result(museum_api.CMA_LABEL, art)
+    assert out["img_url"] == "https://example.org/a.jpg"
+    assert out["artist"] == "Vincent van Gogh"
+    assert out["creation_date"] == "1889"
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+
+@pytest.fixture
+def met_urls(monkeypatch):
+    """Record the URLs requested from the MET search API (which finds nothing)."""
+    urls = []
+
+    def fake_get(url, **kwargs):
+        urls.append(url)
+        return _FakeResponse({"objectIDs": []})
+
+    monkeypatch.setattr(museum_api._SESSION, "get", fake_get)
+    museum_api._fetch_met_ids.clear()
+    return urls
+
+
+def test_met_search_keeps_wildcard_literal(met_urls):
+    assert museum_api.fx_search_met("*") == []
+    assert "q=*" in met_urls[0]
+
+
+def test_met_search_only_applies_requested_flags(met_urls):
+    museum_api.fx_search_met("monet")
+    museum_api.fx_search_met("monet", highlight=True)
+    assert "isHighlight" not in met_urls[0] and "isOnView" not in met_urls[0]
+    assert met_urls[1].count("isHighlight=true") == 1
+
+
+def test_met_search_drops_failed_objects_and_caps_at_five(monkeypatch):
+    fetched = []
+
+    def fake_fetch(i):
+        fetched.append(i)
+        return None if i < 3 else {"objectID": i}
+
+    monkeypatch.setattr(museum_api, "_fetch_met_ids", lambda q, h: list(range(20)))
+    monkeypatch.setattr(museum_api, "_fetch_met_object", fake_fetch)
+    monkeypatch.setattr(museum_api, "_MET_NEXT", {})
+    monkeypatch.setattr(museum_api, "_prefetch_ids", lambda ids: None)
+    # At most 3 of the 8 sampled IDs can fail, so the spares fill the grid.
+    out = museum_api.fx_search_met("monet")
+    assert len(fetched) == 8
+    assert len(out) == 5
+    assert all(a["objectID"] >= 3 for a in out)
+
+
+def test_met_search_uses_prefetched_sample(monkeypatch):
+    warmed = []
+    monkeypatch.setattr(museum_api, "_fetch_met_ids", lambda q, h: list(range(100)))
+    monkeypatch.setattr(museum_api, "_fetch_met_object", lambda i: {"objectID": i})
+    monkeypatch.setattr(museum_api, "_MET_NEXT", {})
+    monkeypatch.setattr(museum_api, "_prefetch_ids", warmed.append)
+    museum_api.fx_search_met("monet")
+    out = museum_api.fx_search_met("monet")
+    # The second search draws exactly the IDs the first one warmed.
+    assert [a["objectID"] for a in out] == warmed[0][:5]
+
+
+def test_fx_search_results_matches_single():
+    arts = [{"objectID": 7, "title": "Wheat Field", "artist": "Van Gogh",
+             "objectDate": "1887", "primaryImageSmall": "x.jpg"}, {}]
+    out = museum_api.fx_search_results(museum_api.MET_LABEL, arts)
+    assert out == [museum_api.fx_search_result(museum_api.MET_LABEL, a) for a in arts]